@@ -1,327 +1,322 @@
 import argparse
+import hashlib
+import logging
+import numpy as np
+import os
 import pandas as pd
 import re
-from collections import defaultdict
-from typing import Dict, List, Tuple
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Log entry patterns, compiled once at import time since they run against every row
+_PLAYER_RE = re.compile(r'^"([^"]+)"')
+_AMOUNT_RE = re.compile(r'(\d+\.\d+)')
+# Forced blinds/antes and voluntary actions in one scan; forced wording always leads the
+# action text, so a forced match wins before any amount could be read as a VPIP action.
+# PokerNow always writes actions in lower case, so no case-insensitive matching is needed
+_FORCED_OR_VPIP = re.compile(
+    r'(?P<forced>posts a (?:big|small) blind|\((?:big blind|small blind|ante)\))'
+    r'|(?P<vpip>(?:calls|bets|raises to|posts a bet of) (?P<amount>\d+\.\d+))'
+)
+_BUYIN_RE = re.compile(r'approved the player "([^"]+)" participation with a stack of (\d+(?:\.\d+)?)')
+_STACK_UPDATE_RE = re.compile(r'updated the player "([^"]+)" stack from (\d+(?:\.\d+)?) to (\d+(?:\.\d+)?)')
+_CASHOUT_RE = re.compile(r'"([^"]+)" quits the game with a stack of (\d+(?:\.\d+)?)')
+_STACKS_RE = re.compile(r'"([^"]+)"\s*\((\d+(?:\.\d+)?)\)')
+# Table events that drive the hand state machine, identified in one scan via lastgroup
+_EVENT_RE = re.compile(
+    r'(?P<start>starting hand #\d+)|(?P<flop>Flop:)|(?P<turn>Turn:)|(?P<river>River:)'
+    r'|(?P<end>ending hand)|(?P<stacks>Player stacks:)'
+)
+# One alternation whose named groups map straight to the normalized hand type labels.
+# Hi/lo hands read "with hi hand with <hand>", so look past that prefix for the real hand
+# and only fall back to the bare "hi hand"/"low hand" label when no hand type follows.
+# Hand names are Title Case, or lower case inside hi/lo descriptions ("hi hand with full house
+# kings full of fours"); both spellings are listed rather than matching case-insensitively
+_HAND_TYPE_RE = re.compile(
+    r'with (?:(?:hi|low) hand with )?'
+    r'(?:(?P<sf>Straight Flush|straight flush)|(?P<quads>Four of a Kind|four of a kind)'
+    r'|(?P<fh>Full House|full house)|(?P<fl>Royal Flush|royal flush|Flush|flush)'
+    r'|(?P<st>Straight|straight)|(?P<trips>Three of a Kind|three of a kind)'
+    r'|(?P<tp>Two Pair|two pair)|(?P<pair>One Pair|one pair|Pair|pair)|(?P<hi>[A-Z] High))'
+    r'|with (?P<other>hi hand|low hand)'
+)
+_LABEL = {
+    'sf': 'Straight Flush',
+    'quads': 'Four of a Kind',
+    'fh': 'Full House',
+    'fl': 'Flush',
+    'st': 'Straight',
+    'trips': 'Three of a Kind',
+    'tp': 'Two Pair',
+    'pair': 'One Pair',
+    'hi': 'High Card',
+    'other': 'Other',
+}
+
+# Betting phases in play order; PHASE_IDX gives each phase's column in the phase amount array
+PHASES = ('preflop', 'flop', 'turn', 'river')
+PHASE_IDX = {phase: i for i, phase in enumerate(PHASES)}
+PREFLOP = PHASE_IDX['preflop']
+
+# Bump when parsing changes so stale cached stats are not reused
+_CACHE_VERSION = 3
+# Cached stats column -> per-player stat array
+_CACHE_COLUMNS = {
+    'hands_dealt': '_hands_dealt',
+    'vpip_hands': '_vpip_hands',
+    'total_put_in_pot': '_put_in',
+    'total_winnings': '_winnings',
+    'wins': '_wins',
+    'buy_ins': '_buy_ins',
+    'final_stack': '_final_stack',
+    'cash_outs': '_cash_outs',
+    'admin_adjustments': '_admin_adjustments',
+}
 
 class PokerVPIPAnalyzer:
-    def __init__(self, csv_file_path: str):
-        """Initialize the analyzer with the poker log CSV file."""
+    def __init__(self, csv_file_path: str, cache_dir: Optional[str] = '.cache'):
+        """
+        Initialize the analyzer with the poker log CSV file.
+        Parsed stats are cached as Parquet in cache_dir; pass None to disable caching.
+        """
         self.csv_file_path = csv_file_path
+        self.cache_dir = cache_dir
         self.df = None
-        self.hands = []
-        self.player_stats = defaultdict(lambda: {
-            'hands_dealt': 0,
-            'vpip_hands': 0,
-            'total_put_in_pot': 0.0,
-            'total_winnings': 0.0,
-            'wins': 0,
-            'buy_ins': 0.0,
-            'final_stack': 0.0,
-            'cash_outs': 0.0,
-            'admin_adjustments': 0.0,
-            'hand_types_won': defaultdict(int),
-            'betting_phase_amounts': {
-                'preflop': 0.0,
-                'flop': 0.0,
-                'turn': 0.0,
-                'river': 0.0
-            }
-        })
+        self._entries = None
+        # Player statistics are kept column-wise: each player gets a row index in _pidx
+        # (in order of first appearance) into parallel arrays, grown on demand
+        self._pidx: Dict[str, int] = {}
+        self._hands_dealt = np.zeros(0, dtype=np.int64)
+        self._vpip_hands = np.zeros(0, dtype=np.int64)
+        self._put_in = np.zeros(0)
+        self._winnings = np.zeros(0)
+        self._wins = np.zeros(0, dtype=np.int64)
+        self._buy_ins = np.zeros(0)
+        self._final_stack = np.zeros(0)
+        self._cash_outs = np.zeros(0)
+        self._admin_adjustments = np.zeros(0)
+        self._phase_amt = np.zeros((0, len(PHASES)))
+        self._hand_types_won: List[Counter] = []
+        
+    def _idx(self, player: str) -> int:
+        """
+        Return the stats row of a player, adding the player on first sight.
+        Adding a player may reallocate the arrays, so always get the index before indexing.
+        """
+        i = self._pidx.setdefault(player, len(self._pidx))
+        if i == len(self._hand_types_won):
+            if i == len(self._hands_dealt):
+                self._grow(max(8, 2 * i))
+            self._hand_types_won.append(Counter())
+        return i
+        
+    def _grow(self, capacity: int):
+        """Resize the per-player stat arrays to hold `capacity` players, zero-filling new rows."""
+        for name in ('_hands_dealt', '_vpip_hands', '_put_in', '_winnings', '_wins', '_buy_ins',
+                     '_final_stack', '_cash_outs', '_admin_adjustments', '_phase_amt'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
         
     def load_data(self):
         """Load the CSV file."""
-        self.df = pd.read_csv(self.csv_file_path)
-        print(f"Loaded {len(self.df)} entries from {self.csv_file_path}")
+        # Only the entry text and its order are used, so skip parsing the other columns
+        read_options = {'usecols': ['entry', 'order'], 'dtype': {'entry': 'string', 'order': 'int64'}}
+        try:
+            self.df = pd.read_csv(self.csv_file_path, engine='pyarrow', **read_options)
+        except ImportError:
+            # pyarrow is optional; fall back to the default C parser without it
+            self.df = pd.read_csv(self.csv_file_path, **read_options)
+        # Sort data by order (chronological order) since the CSV is in reverse
+        self.df = self.df.sort_values('order', kind='mergesort').reset_index(drop=True)
+        self._entries = self.df['entry'].fillna('').astype(str).to_numpy()
+        logger.info("Loaded %d entries from %s", len(self.df), self.csv_file_path)
         
     def extract_player_name(self, entry: str) -> str:
         """Extract player name from an entry string."""
-        match = re.match(r'^"([^"]+)"', entry)
-        return match.group(1) if match else None
+        match = _PLAYER_RE.match(entry)
+        # Interned so the many stats lookups by the same name hit the identity fast path
+        return sys.intern(match.group(1)) if match else None
         
     def extract_amount(self, entry: str) -> float:
         """Extract monetary amount from an entry string."""
         # Look for patterns like "calls 4.00", "bets 28.50", "raises to 11.00"
-        amount_match = re.search(r'(\d+\.\d+)', entry)
+        amount_match = _AMOUNT_RE.search(entry)
         return float(amount_match.group(1)) if amount_match else 0.0
         
-    def is_vpip_action(self, entry: str) -> bool:
+    def classify_action(self, entry: str) -> Tuple[bool, float]:
         """
-        Determine if an action counts as VPIP (Voluntarily Put In Pot).
+        Determine if an action counts as VPIP (Voluntarily Put In Pot) and extract its amount.
         VPIP includes: calls, bets, raises (but NOT forced blinds or ante)
+        Returns (is_vpip, amount).
         """
-        # Exclude forced actions first
-        forced_patterns = [
-            r'posts a big blind',
-            r'posts a small blind',
-            r'\(big blind\)',
-            r'\(small blind\)',
-            r'\(ante\)'
-        ]
-        
-        # Check if it's a forced action first
-        for pattern in forced_patterns:
-            if re.search(pattern, entry, re.IGNORECASE):
-                return False
-        
-        # VPIP actions (voluntary money put in pot)
-        vpip_patterns = [
-            r'calls \d+\.\d+',                   # calls (not blind calls due to exclusion above)
-            r'bets \d+\.\d+',                    # bets
-            r'raises to \d+\.\d+',               # raises
-            r'posts a bet of \d+\.\d+'           # voluntary posts (like bomb pot bets)
-        ]
-                
-        # Check if it's a VPIP action
-        for pattern in vpip_patterns:
-            if re.search(pattern, entry, re.IGNORECASE):
-                return True
-                
-        return False
+        # Forced actions match the 'forced' group and are excluded; calls, bets, raises and
+        # voluntary posts (like bomb pot bets) match the 'vpip' group, which also captures
+        # the amount so the entry doesn't need a second scan
+        match = _FORCED_OR_VPIP.search(entry)
+        if match and match.group('vpip'):
+            return True, float(match.group('amount'))
+        return False, self.extract_amount(entry)
         
     def extract_hand_type(self, entry: str) -> str:
         """Extract the hand type from a winning entry."""
         # Look for patterns like "collected X from pot with [hand type]"
-        patterns = [
-            r'with (Royal Flush)',
-            r'with (Straight Flush)',
-            r'with (Four of a Kind|four of a kind [^(]+)',
-            r'with (Full House|full house [^(]+)',
-            r'with (Flush|flush [^(]+)',
-            r'with (Straight[^,]*)',
-            r'with (Three of a Kind|three of a kind [^(]+)',
-            r'with (Two Pair[^,]*|two pair [^(]+)',
-            r'with (One Pair|Pair[^,]*|pair [^(]+)',
-            r'with ([A-Z] High)',
-            r'with (hi hand|low hand)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, entry, re.IGNORECASE)
-            if match:
-                hand_type = match.group(1).lower()
-                # Normalize hand types
-                if 'straight flush' in hand_type:
-                    return 'Straight Flush'
-                elif 'four of a kind' in hand_type or 'four of a kind' in hand_type:
-                    return 'Four of a Kind'
-                elif 'full house' in hand_type:
-                    return 'Full House'
-                elif 'flush' in hand_type and 'straight' not in hand_type:
-                    return 'Flush'
-                elif 'straight' in hand_type:
-                    return 'Straight'
-                elif 'three of a kind' in hand_type:
-                    return 'Three of a Kind'
-                elif 'two pair' in hand_type:
-                    return 'Two Pair'
-                elif 'pair' in hand_type or 'one pair' in hand_type:
-                    return 'One Pair'
-                elif 'high' in hand_type:
-                    return 'High Card'
-                else:
-                    return 'Other'
-        
-        return 'Didn\'t Show'
+        match = _HAND_TYPE_RE.search(entry)
+        return _LABEL[match.lastgroup] if match else 'Didn\'t Show'
         
     def parse_buy_ins_and_stacks(self):
         """Parse buy-ins, cash-outs, admin adjustments and final stacks from the log."""
-        # Sort data by order (chronological order) since the CSV is in reverse
-        sorted_df = self.df.sort_values('order')
+        # These events are a tiny fraction of the log, so extract them for all rows at once
+        # with pandas' vectorized string ops and only loop over the per-player totals
+        entries = self.df['entry']
         
-        for _, row in sorted_df.iterrows():
-            entry = str(row['entry'])
-            
-            # Look for buy-ins/approvals
-            buy_in_match = re.search(r'approved the player "([^"]+)" participation with a stack of (\d+(?:\.\d+)?)', entry)
-            if buy_in_match:
-                player = buy_in_match.group(1)
-                amount = float(buy_in_match.group(2))
-                self.player_stats[player]['buy_ins'] += amount
-                continue
-                
-            # Look for admin stack updates (from X to Y)
-            stack_update_match = re.search(r'updated the player "([^"]+)" stack from (\d+(?:\.\d+)?) to (\d+(?:\.\d+)?)', entry)
-            if stack_update_match:
-                player = stack_update_match.group(1)
-                from_amount = float(stack_update_match.group(2))
-                to_amount = float(stack_update_match.group(3))
-                # Only count as admin adjustment if stack increased (positive adjustment)
-                # If stack decreased, count as negative adjustment
-                if to_amount > from_amount:
-                    adjustment = to_amount - from_amount
-                    self.player_stats[player]['admin_adjustments'] += adjustment
-                    self.player_stats[player]['buy_ins'] += adjustment
-                elif to_amount < from_amount:
-                    adjustment = from_amount - to_amount
-                    self.player_stats[player]['admin_adjustments'] -= adjustment
-                    self.player_stats[player]['buy_ins'] -= adjustment
-                # Update the actual buyin amount
-                continue
-                
-            # Look for admin stack resets
-            stack_reset_match = re.search(r'reseting to (\d+(?:\.\d+)?) chips', entry)
-            if stack_reset_match:
-                # Find the player name from previous lines or context
-                # This is more complex, but for now we'll skip this pattern
-                # as it's usually followed by an "updated" entry anyway
-                continue
-                
-            # Look for cash-outs (player quits with money)
-            cash_out_match = re.search(r'"([^"]+)" quits the game with a stack of (\d+(?:\.\d+)?)', entry)
-            if cash_out_match:
-                player = cash_out_match.group(1)
-                amount = float(cash_out_match.group(2))
-                self.player_stats[player]['cash_outs'] += amount
-                continue
-                
-            # Look for final stacks (most recent "Player stacks:" entry will have final values)
-            if 'Player stacks:' in entry:
-                # Extract all players and their stacks
-                # Format: #1 "Greg @ bTWHIJcaFV" (996.37) | #2 "Tobi @ C5IYwkBaOk" (127.50)
-                stack_matches = re.findall(r'"([^"]+)"\s*\((\d+(?:\.\d+)?)\)', entry)
-                for player, stack in stack_matches:
-                    self.player_stats[player]['final_stack'] = float(stack)
-                    
-        print("Buy-ins, cash-outs, admin adjustments and final stacks parsed")
+        # Look for buy-ins/approvals
+        buy_ins = entries.str.extract(_BUYIN_RE).dropna()
         
-    def parse_hands(self):
-        """Parse the log entries to identify individual hands and actions."""
-        # Sort data by order (chronological order) since the CSV is in reverse
-        sorted_df = self.df.sort_values('order')
+        # Look for admin stack updates (from X to Y)
+        # A stack increase counts as a positive admin adjustment, a decrease as a negative one,
+        # and either way it also changes the actual buy-in amount
+        updates = entries.str.extract(_STACK_UPDATE_RE).dropna()
+        changes = updates[2].astype(float) - updates[1].astype(float)
+        changes = changes[changes != 0]
         
-        current_hand = None
-        current_hand_players = set()
-        current_phase = 'preflop'  # Track betting phase
+        # Admin stack resets ("reseting to X chips") are skipped: they are queued and
+        # followed by an "updated the player" entry which carries the amounts.
         
-        for _, row in sorted_df.iterrows():
-            entry = str(row['entry'])
+        # Look for cash-outs (player quits with money)
+        cash_outs = entries.str.extract(_CASHOUT_RE).dropna()
+        
+        # Look for final stacks (most recent "Player stacks:" entry will have final values)
+        # Format: #1 "Greg @ bTWHIJcaFV" (996.37) | #2 "Tobi @ C5IYwkBaOk" (127.50)
+        stack_entries = entries[entries.str.contains('Player stacks:', regex=False, na=False)]
+        stacks = stack_entries.str.extractall(_STACKS_RE)
+        
+        # Register players in the order they first appear in the log (rows are in log order),
+        # since the report lists players in that order and uses it to break VPIP% ties
+        first_seen = pd.concat([
+            buy_ins[0], updates.loc[changes.index, 0], cash_outs[0], stacks[0].droplevel('match')
+        ]).sort_index(kind='stable')
+        for player in first_seen.drop_duplicates():
+            self._idx(sys.intern(player))
             
-            # Check for hand start
-            hand_start_match = re.search(r'starting hand #(\d+)', entry)
-            if hand_start_match:
-                # Start new hand
-                hand_number = int(hand_start_match.group(1))
-                current_hand = {
-                    'hand_number': hand_number,
-                    'actions': [],
-                    'players_dealt': [],
-                    'winners': [],
-                    'phases': {'preflop': [], 'flop': [], 'turn': [], 'river': []}
-                }
-                current_hand_players = set()
-                current_phase = 'preflop'
-                continue
-                
-            # Check for betting phases
-            if current_hand:
-                if 'Flop:' in entry:
-                    current_phase = 'flop'
-                    continue
-                elif 'Turn:' in entry:
-                    current_phase = 'turn'
-                    continue
-                elif 'River:' in entry:
-                    current_phase = 'river'
-                    continue
-                
-            # Check for player stacks (indicates who was dealt into the hand)
-            if current_hand and 'Player stacks:' in entry:
-                # Extract all players from the stack info
-                player_matches = re.findall(r'"([^"]+)"', entry)
-                current_hand_players.update(player_matches)
+        buy_in_totals = buy_ins[1].astype(float).groupby(buy_ins[0], sort=False).sum()
+        for player, amount in buy_in_totals.items():
+            i = self._idx(sys.intern(player))
+            self._buy_ins[i] += amount
+            
+        for player, adjustment in changes.groupby(updates[0], sort=False).sum().items():
+            i = self._idx(sys.intern(player))
+            self._admin_adjustments[i] += adjustment
+            self._buy_ins[i] += adjustment
+            
+        cash_out_totals = cash_outs[1].astype(float).groupby(cash_outs[0], sort=False).sum()
+        for player, amount in cash_out_totals.items():
+            i = self._idx(sys.intern(player))
+            self._cash_outs[i] += amount
+            
+        final_stacks = stacks[1].astype(float).groupby(stacks[0], sort=False).last()
+        for player, stack in final_stacks.items():
+            i = self._idx(sys.intern(player))
+            self._final_stack[i] = stack
+            
+        logger.info("Buy-ins, cash-outs, admin adjustments and final stacks parsed")
+        
+    def _close_hand(self, players_dealt: set, vpip_players: set):
+        """Credit dealt and VPIP hands once a hand is over, then empty the sets for the next hand."""
+        for player in players_dealt:
+            i = self._idx(player)
+            self._hands_dealt[i] += 1
+        # Mark VPIP for players who voluntarily put money in preflop
+        for player in vpip_players:
+            i = self._idx(player)
+            self._vpip_hands[i] += 1
+        players_dealt.clear()
+        vpip_players.clear()
+        
+    def _stream_parse(self):
+        """
+        Walk the log once in chronological order and accumulate the per-hand statistics:
+        hands dealt, VPIP, money put in pot by phase, winnings and hand types.
+        """
+        in_hand = False
+        hands_parsed = 0
+        current_phase_idx = PREFLOP  # Track betting phase
+        # Only the current hand is held in memory; _close_hand credits and empties these sets
+        current_dealt_set = set()
+        vpip_set_this_hand = set()
+        
+        for entry in self._entries:
+            # Player actions start with the quoted player name; only other entries can be
+            # table events, and only quoted entries need the player name regex
+            if not entry.startswith('"'):
+                event = _EVENT_RE.search(entry)
+                if event:
+                    kind = event.lastgroup
+                    if kind == 'stacks':
+                        # Player stacks indicate who was dealt into the hand
+                        if in_hand:
+                            current_dealt_set.update(sys.intern(m.group(1)) for m in _STACKS_RE.finditer(entry))
+                    elif kind == 'start' or kind == 'end':
+                        # A hand start or end closes any hand in progress
+                        if in_hand:
+                            self._close_hand(current_dealt_set, vpip_set_this_hand)
+                            hands_parsed += 1
+                        in_hand = kind == 'start'
+                        current_phase_idx = PREFLOP
+                    elif in_hand:
+                        # Betting phase markers (Flop:, Turn:, River:)
+                        current_phase_idx = PHASE_IDX[kind]
                 continue
                 
             # Parse player actions
-            player_name = self.extract_player_name(entry)
-            if player_name and current_hand:
-                action_info = {
-                    'player': player_name,
-                    'action': entry,
-                    'amount': self.extract_amount(entry),
-                    'is_vpip': self.is_vpip_action(entry) and current_phase == 'preflop',  # VPIP only for preflop
-                    'phase': current_phase
-                }
-                current_hand['actions'].append(action_info)
-                current_hand['phases'][current_phase].append(action_info)
-                
-                # Check for wins
-                if 'collected' in entry and 'from pot' in entry:
-                    amount = self.extract_amount(entry)
-                    hand_type = self.extract_hand_type(entry)
-                    current_hand['winners'].append({
-                        'player': player_name,
-                        'amount': amount,
-                        'hand_type': hand_type
-                    })
-                    
-            # Check for hand end
-            if 'ending hand' in entry:
-                if current_hand:
-                    current_hand['players_dealt'] = list(current_hand_players)
-                    self.hands.append(current_hand)
-                current_hand = None
-                current_hand_players = set()
-                current_phase = 'preflop'
-                continue
-        
-        # Don't forget the last hand
-        if current_hand:
-            current_hand['players_dealt'] = list(current_hand_players)
-            self.hands.append(current_hand)
-            
-        print(f"Parsed {len(self.hands)} hands")
-        
-    def calculate_stats(self):
-        """Calculate VPIP and other statistics for each player."""
-        for hand in self.hands:
-            # Track players dealt into this hand
-            for player in hand['players_dealt']:
-                self.player_stats[player]['hands_dealt'] += 1
-                
-            # Track VPIP actions and amounts put in pot by phase
-            vpip_players_this_hand = set()
-            for action in hand['actions']:
-                player = action['player']
-                amount = action['amount']
-                phase = action['phase']
+            player_name = self.extract_player_name(entry) if in_hand else None
+            if player_name:
+                is_vpip, amount = self.classify_action(entry)
                 
                 # Track total money put in pot by phase (all actions with amounts except collections)
-                if amount > 0 and 'collected' not in action['action']:
-                    self.player_stats[player]['total_put_in_pot'] += amount
-                    self.player_stats[player]['betting_phase_amounts'][phase] += amount
+                if amount > 0 and 'collected' not in entry:
+                    i = self._idx(player_name)
+                    self._put_in[i] += amount
+                    self._phase_amt[i, current_phase_idx] += amount
                     
                 # Track VPIP (only preflop voluntary actions)
-                if action['is_vpip']:
-                    vpip_players_this_hand.add(player)
+                if is_vpip and current_phase_idx == PREFLOP:
+                    vpip_set_this_hand.add(player_name)
                     
-            # Mark VPIP for players who voluntarily put money in preflop
-            for player in vpip_players_this_hand:
-                self.player_stats[player]['vpip_hands'] += 1
-                
-            # Track winnings and hand types
-            for winner in hand['winners']:
-                player = winner['player']
-                amount = winner['amount']
-                hand_type = winner['hand_type']
-                self.player_stats[player]['total_winnings'] += amount
-                self.player_stats[player]['wins'] += 1
-                self.player_stats[player]['hand_types_won'][hand_type] += 1
-                
+                # Track winnings and hand types
+                if 'collected' in entry and 'from pot' in entry:
+                    i = self._idx(player_name)
+                    self._winnings[i] += amount
+                    self._wins[i] += 1
+                    self._hand_types_won[i][self.extract_hand_type(entry)] += 1
+        
+        # Don't forget the last hand
+        if in_hand:
+            self._close_hand(current_dealt_set, vpip_set_this_hand)
+            hands_parsed += 1
+            
+        logger.info("Parsed %d hands", hands_parsed)
+        
         # Debug output
-        print(f"\nPlayer stats summary:")
-        for player, stats in list(self.player_stats.items())[:3]:
-            print(f"{player}: {stats['hands_dealt']} hands, {stats['vpip_hands']} VPIP hands, "
-                  f"${stats['total_put_in_pot']:.2f} put in, ${stats['total_winnings']:.2f} won")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Player stats summary:")
+            for player, i in list(self._pidx.items())[:3]:
+                logger.debug("%s: %d hands, %d VPIP hands, $%.2f put in, $%.2f won", player,
+                             self._hands_dealt[i], self._vpip_hands[i], self._put_in[i], self._winnings[i])
                   
-    def get_top_hand_types(self, player_stats: dict, n: int = 2) -> List[Tuple[str, int]]:
+    def get_top_hand_types(self, player: str, n: int = 2) -> List[Tuple[str, int]]:
         """Get the top N hand types a player won with."""
-        hand_types = player_stats['hand_types_won']
+        hand_types = self._hand_types_won[self._pidx[player]]
         if not hand_types:
             return [('No wins', 0)] * n
         
-        sorted_types = sorted(hand_types.items(), key=lambda x: x[1], reverse=True)
-        result = sorted_types[:n]
+        result = hand_types.most_common(n)
         
         # Pad with empty entries if needed
         while len(result) < n:
@@ -329,11 +324,17 @@ class PokerVPIPAnalyzer:
             
         return result
         
-    def get_top_betting_phases(self, player_stats: dict, n: int = 2) -> List[Tuple[str, float]]:
+    def get_top_betting_phases(self, player: str, n: int = 2) -> List[Tuple[str, float]]:
         """Get the top N betting phases where a player bet the most."""
-        phases = player_stats['betting_phase_amounts']
-        sorted_phases = sorted(phases.items(), key=lambda x: x[1], reverse=True)
-        result = sorted_phases[:n]
+        # Single pass keeping the top N in order; equal amounts keep play order
+        result = []
+        for phase, amount in zip(PHASES, self._phase_amt[self._pidx[player]].tolist()):
+            pos = len(result)
+            while pos and result[pos - 1][1] < amount:
+                pos -= 1
+            if pos < n:
+                result.insert(pos, (phase, amount))
+                del result[n:]
         
         # Pad with empty entries if needed
         while len(result) < n:
@@ -341,122 +342,238 @@ class PokerVPIPAnalyzer:
             
         return result
                   
-    def generate_report(self) -> Dict:
-        """Generate a comprehensive report of all player statistics."""
-        report = {}
+    def _report_columns(self) -> Dict[str, list]:
+        """Compute the report values as columns, one list entry per player in player index order."""
+        n = len(self._pidx)
+        hands_dealt = self._hands_dealt[:n]
         
-        for player, stats in self.player_stats.items():
-            hands_dealt = stats['hands_dealt']
-            vpip_hands = stats['vpip_hands']
-            
-            # Calculate VPIP percentage
-            vpip_percentage = (vpip_hands / hands_dealt * 100) if hands_dealt > 0 else 0
-            
-            # Calculate profit/loss using buy-ins, cash-outs and final stack
-            # Net Profit = Final Stack + Cash Outs - Buy Ins - Admin Adjustments
-            # (Admin adjustments are additional money given to player, so subtract from profit)
-            actual_profit = stats['final_stack'] + stats['cash_outs'] - stats['buy_ins'] - stats['admin_adjustments']
-            
-            # Also calculate estimated profit from hand tracking (for comparison)
-            estimated_profit = stats['total_winnings'] - stats['total_put_in_pot']
-            
-            # Get top hand types and betting phases
-            top_hand_types = self.get_top_hand_types(stats, 2)
-            top_betting_phases = self.get_top_betting_phases(stats, 2)
-            
-            report[player] = {
-                'hands_dealt': hands_dealt,
-                'vpip_hands': vpip_hands,
-                'vpip_percentage': round(vpip_percentage, 2),
-                'buy_ins': round(stats['buy_ins'], 2),
-                'admin_adjustments': round(stats['admin_adjustments'], 2),
-                'final_stack': round(stats['final_stack'], 2),
-                'cash_outs': round(stats['cash_outs'], 2),
-                'actual_profit': round(actual_profit, 2),
-                'estimated_profit': round(estimated_profit, 2),
-                'total_put_in_pot': round(stats['total_put_in_pot'], 2),
-                'total_winnings': round(stats['total_winnings'], 2),
-                'wins': stats['wins'],
-                'top_hand_type': top_hand_types[0][0],
-                'top_hand_type_count': top_hand_types[0][1],
-                'second_hand_type': top_hand_types[1][0],
-                'second_hand_type_count': top_hand_types[1][1],
-                'top_betting_phase': top_betting_phases[0][0],
-                'top_betting_amount': round(top_betting_phases[0][1], 2),
-                'second_betting_phase': top_betting_phases[1][0],
-                'second_betting_amount': round(top_betting_phases[1][1], 2)
-            }
+        # Calculate VPIP percentage
+        vpip_percentage = np.divide(self._vpip_hands[:n], hands_dealt, out=np.zeros(n), where=hands_dealt > 0) * 100
+        
+        # Calculate profit/loss using buy-ins, cash-outs and final stack
+        # Net Profit = Final Stack + Cash Outs - Buy Ins - Admin Adjustments
+        # (Admin adjustments are additional money given to player, so subtract from profit)
+        actual_profit = self._final_stack[:n] + self._cash_outs[:n] - self._buy_ins[:n] - self._admin_adjustments[:n]
+        
+        # Also calculate estimated profit from hand tracking (for comparison)
+        estimated_profit = self._winnings[:n] - self._put_in[:n]
+        
+        # Get top hand types and betting phases
+        top_hand_types = [self.get_top_hand_types(player, 2) for player in self._pidx]
+        top_betting_phases = [self.get_top_betting_phases(player, 2) for player in self._pidx]
+        
+        def rounded(values) -> list:
+            # Python's round on plain floats, matching how the report has always rounded
+            return [round(value, 2) for value in values.tolist()]
             
-        return report
+        return {
+            'hands_dealt': hands_dealt.tolist(),
+            'vpip_hands': self._vpip_hands[:n].tolist(),
+            'vpip_percentage': rounded(vpip_percentage),
+            'buy_ins': rounded(self._buy_ins[:n]),
+            'admin_adjustments': rounded(self._admin_adjustments[:n]),
+            'final_stack': rounded(self._final_stack[:n]),
+            'cash_outs': rounded(self._cash_outs[:n]),
+            'actual_profit': rounded(actual_profit),
+            'estimated_profit': rounded(estimated_profit),
+            'total_put_in_pot': rounded(self._put_in[:n]),
+            'total_winnings': rounded(self._winnings[:n]),
+            'wins': self._wins[:n].tolist(),
+            'top_hand_type': [top[0][0] for top in top_hand_types],
+            'top_hand_type_count': [top[0][1] for top in top_hand_types],
+            'second_hand_type': [top[1][0] for top in top_hand_types],
+            'second_hand_type_count': [top[1][1] for top in top_hand_types],
+            'top_betting_phase': [top[0][0] for top in top_betting_phases],
+            'top_betting_amount': [round(top[0][1], 2) for top in top_betting_phases],
+            'second_betting_phase': [top[1][0] for top in top_betting_phases],
+            'second_betting_amount': [round(top[1][1], 2) for top in top_betting_phases]
+        }
         
-    def print_report(self):
-        """Print a formatted report of all player statistics."""
-        report = self.generate_report()
+    def generate_report(self) -> Dict:
+        """Generate a comprehensive report of all player statistics."""
+        columns = self._report_columns()
+        return {
+            player: {key: values[i] for key, values in columns.items()}
+            for i, player in enumerate(self._pidx)
+        }
         
-        print("\n" + "="*120)
-        print("POKER VPIP ANALYSIS REPORT")
-        print("="*120)
+    def format_report(self) -> str:
+        """Format the report of all player statistics as printable text."""
+        columns = self._report_columns()
+        players = list(self._pidx)
+        # Build the whole report as one string so it is written in one go rather than line by line
+        out = []
+        
+        out.append("\n" + "="*120 + "\n")
+        out.append("POKER VPIP ANALYSIS REPORT\n")
+        out.append("="*120 + "\n")
         
         # Sort players by VPIP percentage (descending)
-        sorted_players = sorted(report.items(), key=lambda x: x[1]['vpip_percentage'], reverse=True)
+        order = np.argsort(-np.array(columns['vpip_percentage']), kind='stable').tolist()
         
-        print(f"{'Player':<25} {'Hands':<6} {'VPIP':<6} {'VPIP%':<7} {'Buy-In':<8} {'Admin+':<8} {'Stack':<8} {'Profit':<8} {'Wins':<5}")
-        print("-" * 120)
+        out.append(f"{'Player':<25} {'Hands':<6} {'VPIP':<6} {'VPIP%':<7} {'Buy-In':<8} {'Admin+':<8} {'Stack':<8} {'Profit':<8} {'Wins':<5}\n")
+        out.append("-" * 120 + "\n")
         
-        for player, stats in sorted_players:
-            print(f"{player:<25} {stats['hands_dealt']:<6} {stats['vpip_hands']:<6} "
-                  f"{stats['vpip_percentage']:<7.1f}% ${stats['buy_ins']:<7.2f} "
-                  f"${stats['admin_adjustments']:<7.2f} ${stats['final_stack']:<7.2f} ${stats['actual_profit']:<7.2f} {stats['wins']:<5}")
+        for i in order:
+            out.append(f"{players[i]:<25} {columns['hands_dealt'][i]:<6} {columns['vpip_hands'][i]:<6} "
+                       f"{columns['vpip_percentage'][i]:<7.1f}% ${columns['buy_ins'][i]:<7.2f} "
+                       f"${columns['admin_adjustments'][i]:<7.2f} ${columns['final_stack'][i]:<7.2f} ${columns['actual_profit'][i]:<7.2f} {columns['wins'][i]:<5}\n")
                   
-        print("\n" + "="*120)
-        print("HAND TYPES WON ANALYSIS")
-        print("="*120)
-        print(f"{'Player':<25} {'Most Won With':<20} {'Count':<6} {'2nd Most Won With':<20} {'Count':<6}")
-        print("-" * 120)
-        
-        for player, stats in sorted_players:
-            print(f"{player:<25} {stats['top_hand_type']:<20} {stats['top_hand_type_count']:<6} "
-                  f"{stats['second_hand_type']:<20} {stats['second_hand_type_count']:<6}")
+        out.append("\n" + "="*120 + "\n")
+        out.append("HAND TYPES WON ANALYSIS\n")
+        out.append("="*120 + "\n")
+        out.append(f"{'Player':<25} {'Most Won With':<20} {'Count':<6} {'2nd Most Won With':<20} {'Count':<6}\n")
+        out.append("-" * 120 + "\n")
+        
+        for i in order:
+            out.append(f"{players[i]:<25} {columns['top_hand_type'][i]:<20} {columns['top_hand_type_count'][i]:<6} "
+                       f"{columns['second_hand_type'][i]:<20} {columns['second_hand_type_count'][i]:<6}\n")
                   
-        print("\n" + "="*120)
-        print("BETTING PHASE ANALYSIS")
-        print("="*120)
-        print(f"{'Player':<25} {'Most Bet Phase':<15} {'Amount':<10} {'2nd Most Phase':<15} {'Amount':<10}")
-        print("-" * 120)
-        
-        for player, stats in sorted_players:
-            print(f"{player:<25} {stats['top_betting_phase']:<15} ${stats['top_betting_amount']:<9.2f} "
-                  f"{stats['second_betting_phase']:<15} ${stats['second_betting_amount']:<9.2f}")
-        
-        print("\n" + "="*120)
-        print("DEFINITIONS:")
-        print("VPIP = Voluntarily Put In Pot (% of hands where player voluntarily invested money PRE-FLOP only)")
-        print("Buy-In = Initial amount bought in during session (approved participation entries only)")
-        print("Admin+ = Additional money given by admin (stack updates/adjustments)")
-        print("Stack = Final stack amount") 
-        print("Profit = Actual profit/loss (Final Stack + Cash Outs - Buy-In - Admin Adjustments)")
-        print("Wins = Number of pots won")
-        print("Hand Types = The poker hands players won with most frequently")
-        print("Betting Phase = When players invested the most money (preflop/flop/turn/river)")
+        out.append("\n" + "="*120 + "\n")
+        out.append("BETTING PHASE ANALYSIS\n")
+        out.append("="*120 + "\n")
+        out.append(f"{'Player':<25} {'Most Bet Phase':<15} {'Amount':<10} {'2nd Most Phase':<15} {'Amount':<10}\n")
+        out.append("-" * 120 + "\n")
+        
+        for i in order:
+            out.append(f"{players[i]:<25} {columns['top_betting_phase'][i]:<15} ${columns['top_betting_amount'][i]:<9.2f} "
+                       f"{columns['second_betting_phase'][i]:<15} ${columns['second_betting_amount'][i]:<9.2f}\n")
         
+        out.append("\n" + "="*120 + "\n")
+        out.append("DEFINITIONS:\n")
+        out.append("VPIP = Voluntarily Put In Pot (% of hands where player voluntarily invested money PRE-FLOP only)\n")
+        out.append("Buy-In = Initial amount bought in during session (approved participation entries only)\n")
+        out.append("Admin+ = Additional money given by admin (stack updates/adjustments)\n")
+        out.append("Stack = Final stack amount\n") 
+        out.append("Profit = Actual profit/loss (Final Stack + Cash Outs - Buy-In - Admin Adjustments)\n")
+        out.append("Wins = Number of pots won\n")
+        out.append("Hand Types = The poker hands players won with most frequently\n")
+        out.append("Betting Phase = When players invested the most money (preflop/flop/turn/river)\n")
+        return "".join(out)
+        
+    def print_report(self):
+        """Print a formatted report of all player statistics."""
+        sys.stdout.write(self.format_report())
+        
+    def _cache_path(self) -> str:
+        """Path of the stats cache for the CSV file, keyed on its path, mtime and size."""
+        path = os.path.abspath(self.csv_file_path)
+        source = f"{_CACHE_VERSION}:{path}:{os.path.getmtime(path)}:{os.path.getsize(path)}"
+        key = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+        
+    def load_cached_stats(self) -> bool:
+        """Load previously parsed player stats for this CSV file. Returns False on a cache miss."""
+        if self.cache_dir is None:
+            return False
+        cache_path = self._cache_path()
+        if not os.path.exists(cache_path):
+            return False
+        try:
+            stats = pd.read_parquet(cache_path)
+        except (ImportError, OSError, ValueError):
+            # No Parquet engine installed or an unreadable cache file; parse the CSV instead
+            return False
+            
+        self._pidx = {player: i for i, player in enumerate(stats['player'])}
+        for column, name in _CACHE_COLUMNS.items():
+            setattr(self, name, stats[column].to_numpy(dtype=getattr(self, name).dtype))
+        self._phase_amt = stats[list(PHASES)].to_numpy(dtype=float)
+        # Hand types are stored as parallel lists to keep each player's first-won order
+        self._hand_types_won = [
+            Counter(dict(zip(hand_types.tolist(), counts.tolist())))
+            for hand_types, counts in zip(stats['hand_types'], stats['hand_type_counts'])
+        ]
+        logger.info("Loaded cached stats for %s from %s", self.csv_file_path, cache_path)
+        return True
+        
+    def save_cached_stats(self):
+        """Write the parsed player stats to the cache as Parquet."""
+        if self.cache_dir is None:
+            return
+        n = len(self._pidx)
+        stats = pd.DataFrame({'player': list(self._pidx)})
+        for column, name in _CACHE_COLUMNS.items():
+            stats[column] = getattr(self, name)[:n]
+        for j, phase in enumerate(PHASES):
+            stats[phase] = self._phase_amt[:n, j]
+        stats['hand_types'] = [list(hand_types) for hand_types in self._hand_types_won]
+        stats['hand_type_counts'] = [list(hand_types.values()) for hand_types in self._hand_types_won]
+        
+        cache_path = self._cache_path()
+        # Write to a temporary file first so concurrent runs never see a partial cache file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            stats.to_parquet(tmp_path, compression='zstd', index=False)
+            os.replace(tmp_path, cache_path)
+        except (ImportError, OSError) as e:
+            # Caching is best effort; the analysis itself already succeeded
+            logger.warning("Could not cache stats to %s: %s", cache_path, e)
+            
+    def analyze(self):
+        """Compute the player statistics, from the cache when possible."""
+        if not self.load_cached_stats():
+            self.load_data()
+            self.parse_buy_ins_and_stacks()
+            self._stream_parse()
+            self.save_cached_stats()
+            
     def run_analysis(self):
         """Run the complete analysis."""
-        self.load_data()
-        self.parse_buy_ins_and_stacks()
-        self.parse_hands()
-        self.calculate_stats()
+        self.analyze()
         self.print_report()
         return self.generate_report()
+        
+    @classmethod
+    def run_many(cls, csv_file_paths: List[str], cache_dir: Optional[str] = '.cache',
+                 max_workers: Optional[int] = None, log_level: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Run the analysis for several CSV files in parallel worker processes.
+        Reports are printed in the order the files were given; returns {csv_file_path: report}.
+        If log_level is given, logging is configured at that level in each worker process.
+        """
+        worker = partial(_analyze_file, cls, cache_dir=cache_dir)
+        # Workers started with 'spawn' (the macOS default) don't inherit the parent's logging setup
+        initializer, initargs = (_init_worker_logging, (log_level,)) if log_level is not None else (None, ())
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs) as executor:
+            results = list(executor.map(worker, csv_file_paths))
+            
+        # Workers only format their reports so the output of different files never interleaves
+        reports = {}
+        for csv_file_path, (report_text, report) in zip(csv_file_paths, results):
+            sys.stdout.write(f"\n{csv_file_path}{report_text}")
+            reports[csv_file_path] = report
+        return reports
+
+def _init_worker_logging(level: int):
+    """Worker initializer for PokerVPIPAnalyzer.run_many: log like the CLI does."""
+    logging.basicConfig(level=level, format='%(message)s')
+
+def _analyze_file(cls, csv_file_path: str, cache_dir: Optional[str]) -> Tuple[str, Dict]:
+    """Worker for PokerVPIPAnalyzer.run_many: analyze one file and return its formatted and raw report."""
+    analyzer = cls(csv_file_path, cache_dir=cache_dir)
+    analyzer.analyze()
+    return analyzer.format_report(), analyzer.generate_report()
 
-# Run the script by running the command: python poker_analysis.py --file <csv_file_path>
+# Run the script by running the command: python poker_analysis.py --file <csv_file_path> [<csv_file_path> ...]
 # Example: python poker_analysis.py --file poker_now_log_2025_07_30.csv
 
 def main():
     parser = argparse.ArgumentParser(description='Poker analysis script')
-    parser.add_argument('--file', type=str, required=True, help='Path to the CSV file')
+    parser.add_argument('--file', type=str, nargs='+', required=True,
+                        help='Path to the CSV file (several files are analyzed in parallel)')
+    parser.add_argument('--no-cache', action='store_true', help='Always re-parse the CSV file instead of using cached stats')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Show progress (-v) and debug (-vv) messages')
     args = parser.parse_args()
-    csv_file_path = args.file
-    analyzer = PokerVPIPAnalyzer(csv_file_path)
+    log_level = [logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)]
+    logging.basicConfig(level=log_level, format='%(message)s')
+    cache_dir = None if args.no_cache else '.cache'
+    if len(args.file) > 1:
+        PokerVPIPAnalyzer.run_many(args.file, cache_dir=cache_dir, log_level=log_level)
+        return
+    csv_file_path = args.file[0]
+    analyzer = PokerVPIPAnalyzer(csv_file_path, cache_dir=cache_dir)
     
     analyzer.run_analysis() 
 